@@ -1,90 +1,84 @@
-import pandas as pd
+import warnings
+
 import openpyxl
+import openpyxl.cell
 import openpyxl.styles
+import openpyxl.worksheet.table
 
+# Define the colors
+NO_ERROR_COLOR = '00FF00' # Light green
+ERROR_COLOR = 'FF0000' #red
+COLOR_HEADER = '4285F4'  # Dark blue
+COLOR_WHITE = 'FFFFFF'  # White
+COLOR_LIGHT_BLUE = 'DDEBF7'  # Light blue
 
-def write_excel_file(excel_file_path, pin_data, additional_info, duplicate_EXTI_error=True):
-    sheet_name = None
-    row_counter = 1
-    row_header = None
-    # Export the DataFrame to Excel with alternating row colors, borders, and adjusted column widths
-    with pd.ExcelWriter(excel_file_path, engine='openpyxl') as writer:
-        pin_data.to_excel(writer, sheet_name='Sheet1', index=False)
+# Styles shared by all the cells, so they are not created again for every cell
+NO_ERROR_FILL = openpyxl.styles.PatternFill(start_color=NO_ERROR_COLOR, end_color=NO_ERROR_COLOR, fill_type='solid')
+ERROR_FILL = openpyxl.styles.PatternFill(start_color=ERROR_COLOR, end_color=ERROR_COLOR, fill_type='solid')
+HEADER_FILL = openpyxl.styles.PatternFill(start_color=COLOR_HEADER, end_color=COLOR_HEADER, fill_type='solid')
+WHITE_FILL = openpyxl.styles.PatternFill(start_color=COLOR_WHITE, end_color=COLOR_WHITE, fill_type='solid')
+LIGHT_BLUE_FILL = openpyxl.styles.PatternFill(start_color=COLOR_LIGHT_BLUE, end_color=COLOR_LIGHT_BLUE, fill_type='solid')
 
-        # Access the Excel writer and the sheet
-        workbook = writer.book
-        sheet = writer.sheets['Sheet1']
-        sheet_name =  sheet
+# Thin lines separating rows and columns
+THIN_BORDER = openpyxl.styles.Side(border_style='thin', color='000000')
+BORDER = openpyxl.styles.Border(left=THIN_BORDER, right=THIN_BORDER, top=THIN_BORDER, bottom=THIN_BORDER)
 
 
-        # Define the colors
-        no_error_color = '00FF00' # Light green
-        error_color = 'FF0000' #red
-        color_header = '4285F4'  # Dark blue
-        color_white = 'FFFFFF'  # White
-        color_light_blue = 'DDEBF7'  # Light blue
+def write_excel_file(excel_file_path, pin_data, additional_info, duplicate_EXTI_error=True):
+    # Export the DataFrame to Excel with alternating row colors, borders, and adjusted column widths.
+    # The workbook is write-only, so the rows are streamed to the file and every cell is created once, already styled
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet('Sheet1')
 
-         # Insert additional info
-        sheet.insert_rows(0)
-        sheet["A1"] = "MCU: " + additional_info['McuName']        
-        sheet["B1"] = "CPN: " + additional_info['McuCPN']
-        sheet["C1"] = "Footprint: " + additional_info['McuPackage']
+    # Content of the sheet: the EXTI check, the additional info, the header and the pins
+    exti_row = ["Error: Duplicate EXTI signal found" if duplicate_EXTI_error else "All good: no duplicated EXTI lines"]
+    info_row = ["MCU: " + additional_info['McuName'], "CPN: " + additional_info['McuCPN'], "Footprint: " + additional_info['McuPackage']]
+    header_row = [str(column) for column in pin_data.columns]
+    pin_rows = list(pin_data.astype(object).where(pin_data.notna(), None).itertuples(index=False, name=None))
 
-        # for col_idx in range(1, sheet.max_column + 1):
-        #     sheet.cell(row=1, column=col_idx).fill = openpyxl.styles.PatternFill(
-        #         start_color = error_color if duplicate_EXTI_error else no_error_color, end_color = error_color if duplicate_EXTI_error else no_error_color, fill_type='solid'
-        #     )
-        row_counter += 1
+    row_header = 3
+    max_col = max(len(info_row), len(header_row))
 
-        # Insert the EXTI check into the excel
-        sheet.insert_rows(0)
-        sheet["A1"] = "Error: Duplicate EXTI signal found" if duplicate_EXTI_error else "All good: no duplicated EXTI lines"
-        for col_idx in range(1, sheet.max_column + 1):
-            sheet.cell(row=1, column=col_idx).fill = openpyxl.styles.PatternFill(
-                start_color = error_color if duplicate_EXTI_error else no_error_color, end_color = error_color if duplicate_EXTI_error else no_error_color, fill_type='solid'
-            )
-        row_counter += 1
+    # Adjust column widths to fit the data, they have to be set before the rows are written
+    widths = [0] * max_col
+    for row in [exti_row, info_row, header_row] + pin_rows:
+        for i, value in enumerate(row):
+            if value is not None and len(str(value)) > widths[i]:
+                widths[i] = len(str(value))
+    for i, width in enumerate(widths):
+        sheet.column_dimensions[openpyxl.utils.get_column_letter(i + 1)].width = width + 2
 
-       
-        row_header = row_counter
-        # Apply color to header
-        for col_idx in range(1, sheet.max_column + 1):
-            sheet.cell(row=row_counter, column=col_idx).fill = openpyxl.styles.PatternFill(
-                start_color = color_header, end_color = color_header, fill_type='solid'
-            )
-        row_counter += 1
-        # Apply alternating row colors starting from the second row
-        for row_idx in range(row_counter, sheet.max_row + 1, 2):
-            for col_idx in range(1, sheet.max_column + 1):
-                fill_color = color_white if row_idx % 4 == 2 else color_light_blue
-                sheet.cell(row=row_idx, column=col_idx).fill = openpyxl.styles.PatternFill(
-                    start_color=fill_color, end_color=fill_color, fill_type='solid'
-                )
+    def append_row(values, fill=None):
+        # Pad the row to the full width, so every cell gets the border
+        cells = []
+        for col_idx in range(max_col):
+            cell = openpyxl.cell.WriteOnlyCell(sheet, value=values[col_idx] if col_idx < len(values) else None)
+            if fill is not None:
+                cell.fill = fill
+            cell.border = BORDER
+            cells.append(cell)
+        sheet.append(cells)
 
-        # Adjust column widths to fit the data
-        for col in sheet.columns:
-            max_length = 0
-            column = col[0].column_letter  # Get the column name
-            for cell in col:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(cell.value)
-                except:
-                    pass
-            adjusted_width = (max_length + 2)
-            sheet.column_dimensions[column].width = adjusted_width
+    append_row(exti_row, ERROR_FILL if duplicate_EXTI_error else NO_ERROR_FILL)
+    append_row(info_row)
+    append_row(header_row, HEADER_FILL)
 
-        # Add thin lines separating rows and columns
-        thin_border = openpyxl.styles.Side(border_style='thin', color='000000')
-        border = openpyxl.styles.Border(left=thin_border, right=thin_border, top=thin_border, bottom=thin_border)
+    # Color every second row after the header
+    for row_idx, values in enumerate(pin_rows, start=row_header + 1):
+        fill = None
+        if (row_idx - row_header) % 2 == 1:
+            fill = WHITE_FILL if row_idx % 4 == 2 else LIGHT_BLUE_FILL
+        append_row(values, fill)
 
-        for row in sheet.iter_rows():
-            for cell in row:
-                cell.border = border
+    # Add the table over the header and the pin rows
+    tab = openpyxl.worksheet.table.Table(displayName="pin_data", ref='A'+str(row_header)+f':{openpyxl.utils.get_column_letter(pin_data.shape[1])}{row_header+len(pin_data)}')
+    # In write-only mode openpyxl cannot read the headings back from the sheet, so the table columns are named here.
+    # add_table always reminds about this in write-only mode, that warning is silenced since the columns are set
+    tab.tableColumns = [openpyxl.worksheet.table.TableColumn(id=i + 1, name=heading) for i, heading in enumerate(header_row)]
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore', message='In write-only mode you must add table columns manually')
+        sheet.add_table(tab)
 
-        print(f'DataFrame exported to {excel_file_path} with alternating row colors and{" without" if not duplicate_EXTI_error else ""} the first line.')
+    workbook.save(excel_file_path)
 
-    wb = openpyxl.load_workbook(filename = excel_file_path)
-    tab = openpyxl.worksheet.table.Table(displayName="pin_data", ref='A'+str(row_header)+f':{openpyxl.utils.get_column_letter(pin_data.shape[1])}{len(pin_data)+1}')
-    wb[sheet_name.title].add_table(tab)
-    wb.save(excel_file_path)
\ No newline at end of file
+    print(f'DataFrame exported to {excel_file_path} with alternating row colors and{" without" if not duplicate_EXTI_error else ""} the first line.')